@@ -2,6 +2,8 @@
 // Math expression validation via Python/SymPy subprocess bridge
 
 import { spawn } from 'node:child_process';
+import type { ChildProcessWithoutNullStreams } from 'node:child_process';
+import type { Socket } from 'node:net';
 import { fileURLToPath } from 'node:url';
 import { dirname, join } from 'node:path';
 import type {
@@ -17,12 +19,12 @@ import type {
 // Types for the Python bridge protocol
 // ---------------------------------------------------------------------------
 
-interface PythonRequest {
+export interface PythonRequest {
   action: 'validate' | 'simplify' | 'to_ascii';
   expression: string;
 }
 
-interface PythonResponse {
+export interface PythonResponse {
   valid: boolean;
   error?: string;
   result?: string;
@@ -37,68 +39,186 @@ const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 const PYTHON_SCRIPT = join(__dirname, 'math_validator.py');
 const DEFAULT_TIMEOUT = 5_000; // 5 seconds
+const STDERR_TAIL_CHARS = 4_096; // stderr kept for exit diagnostics
+
+interface PendingRequest {
+  resolve: (response: PythonResponse) => void;
+  reject: (err: Error) => void;
+  timer: NodeJS.Timeout;
+}
 
 /**
- * Attempt to run a Python subprocess with the math_validator.py bridge script.
- * Returns `null` when Python is unavailable (no error thrown).
+ * Long-lived math_validator.py process speaking newline-delimited JSON.
+ *
+ * The worker is spawned lazily on the first request and reused afterwards,
+ * so the SymPy import and LaTeX parser initialization are paid once per
+ * Node process instead of once per expression. Responses arrive in request
+ * order, so pending requests are resolved FIFO.
  */
-async function callPython(request: PythonRequest): Promise<PythonResponse | null> {
-  const venvPython = join(__dirname, '..', '..', '..', '..', '.venv', 'bin', 'python3');
-  const pythonPaths = [venvPython, 'python3', 'python'];
-
-  for (const pythonBin of pythonPaths) {
-    try {
-      return await runPythonProcess(pythonBin, request);
-    } catch {
-      // Try next binary
-    }
+export class PythonWorker {
+  private proc: ChildProcessWithoutNullStreams | null = null;
+  private buffer = '';
+  private readonly pending: PendingRequest[] = [];
+
+  constructor(
+    private readonly pythonBin: string,
+    private readonly scriptPath: string = PYTHON_SCRIPT,
+    private readonly timeoutMs: number = DEFAULT_TIMEOUT,
+  ) {}
+
+  request(request: PythonRequest): Promise<PythonResponse> {
+    return new Promise<PythonResponse>((resolve, reject) => {
+      const proc = this.ensureProcess();
+
+      const timer = setTimeout(() => {
+        // The stream is out of sync once a response is late; restart the worker.
+        this.fail(new Error(`Python worker timed out after ${String(this.timeoutMs)}ms`));
+      }, this.timeoutMs);
+
+      this.pending.push({ resolve, reject, timer });
+      proc.stdin.write(`${JSON.stringify(request)}\n`);
+    });
   }
 
-  // Python not available at all
-  return null;
-}
+  private ensureProcess(): ChildProcessWithoutNullStreams {
+    if (this.proc !== null) {
+      return this.proc;
+    }
 
-function runPythonProcess(
-  pythonBin: string,
-  request: PythonRequest,
-): Promise<PythonResponse> {
-  return new Promise<PythonResponse>((resolve, reject) => {
-    const proc = spawn(pythonBin, [PYTHON_SCRIPT], {
+    const proc = spawn(this.pythonBin, [this.scriptPath], {
       stdio: ['pipe', 'pipe', 'pipe'],
-      timeout: DEFAULT_TIMEOUT,
     });
+    this.proc = proc;
+    this.buffer = '';
 
-    let stdout = '';
     let stderr = '';
 
-    proc.stdout.on('data', (chunk: Buffer) => {
-      stdout += chunk.toString();
+    // Decode as a stream so multi-byte UTF-8 characters split across chunks
+    // are reassembled correctly.
+    proc.stdout.setEncoding('utf8');
+    proc.stderr.setEncoding('utf8');
+
+    proc.stdout.on('data', (chunk: string) => {
+      this.buffer += chunk;
+      this.drainLines();
     });
 
-    proc.stderr.on('data', (chunk: Buffer) => {
-      stderr += chunk.toString();
+    proc.stderr.on('data', (chunk: string) => {
+      stderr = (stderr + chunk).slice(-STDERR_TAIL_CHARS);
     });
 
     proc.on('error', (err: Error) => {
-      reject(err);
+      this.fail(err, proc);
+    });
+
+    // Writes to a worker that failed to start surface as EPIPE on stdin.
+    proc.stdin.on('error', (err: Error) => {
+      this.fail(err, proc);
     });
 
     proc.on('close', (code: number | null) => {
-      if (code !== 0) {
-        reject(new Error(`Python exited with code ${String(code)}: ${stderr}`));
-        return;
+      this.fail(new Error(`Python exited with code ${String(code)}: ${stderr}`), proc);
+    });
+
+    // An idle worker must not keep the Node event loop alive; pending
+    // requests hold their own timers while they are in flight.
+    proc.unref();
+    (proc.stdin as unknown as Socket).unref();
+    (proc.stdout as unknown as Socket).unref();
+    (proc.stderr as unknown as Socket).unref();
+
+    return proc;
+  }
+
+  private drainLines(): void {
+    let newline = this.buffer.indexOf('\n');
+    while (newline >= 0) {
+      const line = this.buffer.slice(0, newline).trim();
+      this.buffer = this.buffer.slice(newline + 1);
+      newline = this.buffer.indexOf('\n');
+
+      if (line.length === 0) {
+        continue;
       }
+
+      let parsed: unknown;
       try {
-        const parsed: unknown = JSON.parse(stdout);
-        resolve(parsed as PythonResponse);
+        parsed = JSON.parse(line);
       } catch {
-        reject(new Error(`Failed to parse Python output: ${stdout}`));
+        // Responses are matched by order, so a garbled line leaves every
+        // later response misaligned; restart the worker instead.
+        this.fail(new Error(`Failed to parse Python output: ${line}`));
+        return;
       }
-    });
 
-    proc.stdin.write(JSON.stringify(request));
-    proc.stdin.end();
-  });
+      const next = this.pending.shift();
+      if (next === undefined) {
+        continue;
+      }
+      clearTimeout(next.timer);
+      next.resolve(parsed as PythonResponse);
+    }
+  }
+
+  /**
+   * Reject every in-flight request and drop the process so the next request
+   * respawns it. `source` guards against late events from a replaced process.
+   */
+  private fail(err: Error, source?: ChildProcessWithoutNullStreams): void {
+    if (source !== undefined && source !== this.proc) {
+      return;
+    }
+
+    const proc = this.proc;
+    this.proc = null;
+    this.buffer = '';
+    if (proc !== null && proc.exitCode === null) {
+      proc.kill();
+    }
+
+    for (const entry of this.pending.splice(0)) {
+      clearTimeout(entry.timer);
+      entry.reject(err);
+    }
+  }
+}
+
+const workers = new Map<string, PythonWorker>();
+let preferredPythonBin: string | null = null;
+
+function getWorker(pythonBin: string): PythonWorker {
+  let worker = workers.get(pythonBin);
+  if (worker === undefined) {
+    worker = new PythonWorker(pythonBin);
+    workers.set(pythonBin, worker);
+  }
+  return worker;
+}
+
+/**
+ * Send a request to the persistent math_validator.py worker.
+ * Returns `null` when Python is unavailable (no error thrown).
+ */
+async function callPython(request: PythonRequest): Promise<PythonResponse | null> {
+  const venvPython = join(__dirname, '..', '..', '..', '..', '.venv', 'bin', 'python3');
+  const candidates = [venvPython, 'python3', 'python'];
+  const pythonPaths =
+    preferredPythonBin === null
+      ? candidates
+      : [preferredPythonBin, ...candidates.filter((bin) => bin !== preferredPythonBin)];
+
+  for (const pythonBin of pythonPaths) {
+    try {
+      const response = await getWorker(pythonBin).request(request);
+      preferredPythonBin = pythonBin;
+      return response;
+    } catch {
+      // Try next binary
+    }
+  }
+
+  // Python not available at all
+  return null;
 }
 
 function makeResult(
@@ -1,13 +1,21 @@
 #!/usr/bin/env python3
 """Math expression validator using SymPy.
 
-Protocol:
-  - Input: JSON on stdin with { action, expression }
-  - Output: JSON on stdout with { valid, error?, result?, unavailable? }
-  - If SymPy is not installed, returns {"unavailable": true} immediately.
+Protocol (persistent worker):
+  - Input: newline-delimited JSON on stdin, one { action, expression } per line
+  - Output: one JSON line on stdout per request with { valid, error?, result?, unavailable? }
+  - If SymPy is not installed, every request is answered with {"unavailable": true}.
+  - The process serves requests until stdin is closed, so the SymPy import and
+    LaTeX parser initialization are paid once per worker rather than per call.
 """
 import sys
 import json
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Check SymPy availability upfront
 try:
@@ -18,14 +26,31 @@ except ImportError:
     SYMPY_AVAILABLE = False
 
 
+# SymPy expressions are immutable, so parsed results can be shared between
+# requests. Failures raise and are therefore never cached.
+@lru_cache(maxsize=4096)
+def _cached_parse_latex(expr: str):
+    return parse_latex(expr)
+
+
+@lru_cache(maxsize=4096)
+def _cached_sympify(expr: str):
+    return sympify(expr)
+
+
+@lru_cache(maxsize=4096)
+def _cached_simplify(expr: str):
+    return simplify(_cached_parse_latex(expr))
+
+
 def validate_expression(expr: str) -> dict:
     try:
-        parsed = parse_latex(expr)
+        parsed = _cached_parse_latex(expr)
         return {"valid": True, "result": str(parsed)}
     except Exception:
         # Fallback: try sympify for non-LaTeX expressions
         try:
-            parsed = sympify(expr)
+            parsed = _cached_sympify(expr)
             return {"valid": True, "result": str(parsed)}
         except Exception as e2:
             return {"valid": False, "error": str(e2)}
@@ -33,8 +58,7 @@ def validate_expression(expr: str) -> dict:
 
 def simplify_expression(expr: str) -> dict:
     try:
-        parsed = parse_latex(expr)
-        simplified = simplify(parsed)
+        simplified = _cached_simplify(expr)
         return {"valid": True, "result": str(simplified)}
     except Exception as e:
         return {"valid": False, "error": str(e)}
@@ -42,32 +66,62 @@ def simplify_expression(expr: str) -> dict:
 
 def to_ascii(expr: str) -> dict:
     try:
-        parsed = parse_latex(expr)
+        parsed = _cached_parse_latex(expr)
         return {"valid": True, "result": str(parsed)}
     except Exception as e:
         return {"valid": False, "error": str(e), "result": expr}
 
 
-def main():
-    input_data = json.loads(sys.stdin.read())
+def _loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _write_line(result: dict) -> None:
+    """Write one newline-terminated JSON response and flush it to the caller."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+    else:
+        sys.stdout.buffer.write((json.dumps(result) + "\n").encode("utf-8"))
+    sys.stdout.buffer.flush()
+
 
+def handle_request(input_data: dict) -> dict:
     if not SYMPY_AVAILABLE:
-        print(json.dumps({"unavailable": True}))
-        return
+        return {"unavailable": True}
 
     action = input_data.get("action", "validate")
     expression = input_data.get("expression", "")
 
     if action == "validate":
-        result = validate_expression(expression)
+        return validate_expression(expression)
     elif action == "simplify":
-        result = simplify_expression(expression)
+        return simplify_expression(expression)
     elif action == "to_ascii":
-        result = to_ascii(expression)
+        return to_ascii(expression)
     else:
-        result = {"valid": False, "error": f"Unknown action: {action}"}
+        return {"valid": False, "error": f"Unknown action: {action}"}
 
-    print(json.dumps(result))
+
+def main():
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            break  # stdin closed — caller is done with this worker
+        if not line.strip():
+            continue
+
+        try:
+            data = _loads(line)
+        except json.JSONDecodeError as e:
+            result = {"valid": False, "error": f"Invalid JSON: {e}"}
+        else:
+            if isinstance(data, dict):
+                result = handle_request(data)
+            else:
+                # Answer instead of raising so the worker stays up
+                result = {"valid": False, "error": "Invalid request: expected a JSON object"}
+
+        _write_line(result)
 
 
 if __name__ == "__main__":
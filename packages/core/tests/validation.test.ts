@@ -1,6 +1,9 @@
-import { describe, it, expect } from 'vitest';
+import { describe, it, expect, beforeAll, afterAll } from 'vitest';
+import { mkdtempSync, rmSync, writeFileSync } from 'node:fs';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
 import { SchemaValidator } from '../src/validation/schema-validator.js';
-import { MathValidator } from '../src/validation/math-validator.js';
+import { MathValidator, PythonWorker } from '../src/validation/math-validator.js';
 import { LinkChecker } from '../src/validation/link-checker.js';
 import type {
   DocumentRequest,
@@ -193,6 +196,66 @@ describe('MathValidator', () => {
   });
 });
 
+// =============================================================================
+// PythonWorker
+// =============================================================================
+
+// Stands in for math_validator.py: answers each line with its own pid so tests
+// can tell whether a process was reused. "exit" and "hang" simulate failures.
+const FAKE_WORKER = `
+import { createInterface } from 'node:readline';
+createInterface({ input: process.stdin }).on('line', (line) => {
+  const { expression } = JSON.parse(line);
+  if (expression === 'exit') process.exit(3);
+  if (expression === 'hang') return;
+  process.stdout.write(JSON.stringify({ valid: true, result: String(process.pid) }) + '\\n');
+});
+`;
+
+describe('PythonWorker', () => {
+  let dir: string;
+  let script: string;
+
+  beforeAll(() => {
+    dir = mkdtempSync(join(tmpdir(), 'zen-sci-worker-'));
+    script = join(dir, 'fake-worker.mjs');
+    writeFileSync(script, FAKE_WORKER);
+  });
+
+  afterAll(() => {
+    rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('reuses one process for sequential requests', async () => {
+    const worker = new PythonWorker(process.execPath, script);
+    const first = await worker.request({ action: 'validate', expression: 'x' });
+    const second = await worker.request({ action: 'validate', expression: 'y' });
+    expect(first.valid).toBe(true);
+    expect(second.result).toBe(first.result);
+  });
+
+  it('rejects in-flight requests and respawns after the worker exits', async () => {
+    const worker = new PythonWorker(process.execPath, script);
+    const before = await worker.request({ action: 'validate', expression: 'x' });
+    await expect(worker.request({ action: 'validate', expression: 'exit' })).rejects.toThrow(
+      /exited with code 3/,
+    );
+    const after = await worker.request({ action: 'validate', expression: 'x' });
+    expect(after.valid).toBe(true);
+    expect(after.result).not.toBe(before.result);
+  });
+
+  it('rejects a request that times out and restarts the worker', async () => {
+    const worker = new PythonWorker(process.execPath, script, 200);
+    const before = await worker.request({ action: 'validate', expression: 'x' });
+    await expect(worker.request({ action: 'validate', expression: 'hang' })).rejects.toThrow(
+      /timed out after 200ms/,
+    );
+    const after = await worker.request({ action: 'validate', expression: 'x' });
+    expect(after.result).not.toBe(before.result);
+  });
+});
+
 // =============================================================================
 // LinkChecker
 // =============================================================================
@@ -37,12 +37,17 @@ export class PythonEngine {
       let stdout = '';
       let stderr = '';
 
-      proc.stdout.on('data', (chunk: Buffer) => {
-        stdout += chunk.toString();
+      // Decode as a stream so multi-byte UTF-8 characters split across
+      // chunks (engines emit raw UTF-8 JSON) are reassembled correctly.
+      proc.stdout.setEncoding('utf8');
+      proc.stderr.setEncoding('utf8');
+
+      proc.stdout.on('data', (chunk: string) => {
+        stdout += chunk;
       });
 
-      proc.stderr.on('data', (chunk: Buffer) => {
-        stderr += chunk.toString();
+      proc.stderr.on('data', (chunk: string) => {
+        stderr += chunk;
       });
 
       proc.on('error', (err: Error) => {
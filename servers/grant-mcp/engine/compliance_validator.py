@@ -9,6 +9,11 @@ import json
 import sys
 from typing import Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Page limits by funder and program type
 PAGE_LIMITS: dict[str, dict[str, dict[str, int]]] = {
@@ -53,6 +58,18 @@ PAGE_LIMITS: dict[str, dict[str, dict[str, int]]] = {
     },
 }
 
+# Flattened at import so each request resolves its limits with one tuple
+# lookup; unknown program types fall back to the funder's "default" set.
+_PROGRAM_LIMITS: dict[tuple[str, str], dict[str, int]] = {
+    (funder, program): limits
+    for funder, programs in PAGE_LIMITS.items()
+    for program, limits in programs.items()
+}
+_DEFAULT_LIMITS: dict[str, dict[str, int]] = {
+    funder: programs.get("default", {}) for funder, programs in PAGE_LIMITS.items()
+}
+_NO_LIMITS: dict[str, int] = {}
+
 WORDS_PER_PAGE = 250
 
 
@@ -74,34 +91,36 @@ def validate_compliance(request: dict[str, Any]) -> dict[str, Any]:
     warnings: list[dict[str, str]] = []
 
     # Get page limits
-    funder_limits = PAGE_LIMITS.get(funder, {})
-    limits = funder_limits.get(program_type, funder_limits.get("default", {}))
+    limits = _PROGRAM_LIMITS.get(
+        (funder, program_type), _DEFAULT_LIMITS.get(funder, _NO_LIMITS)
+    )
 
-    # Check page limits
+    # Single pass: empty-section warnings and page-limit violations
     for section in sections:
-        role = section.get("role", "other")
         content = section.get("content", "")
-        pages = estimate_pages(content)
 
-        if role in limits:
-            limit = limits[role]
-            if pages > limit:
-                violations.append({
-                    "section": role,
-                    "rule": "page-limit",
-                    "severity": "error",
-                    "details": f"Section '{role}' estimated at {pages} pages, exceeds limit of {limit}.",
-                })
-
-    # Check for empty sections
-    for section in sections:
-        content = section.get("content", "").strip()
-        if not content:
+        if not content or content.isspace():
+            role = section.get("role", "unknown")
             warnings.append({
-                "section": section.get("role", "unknown"),
+                "section": role,
                 "rule": "empty-section",
                 "severity": "warning",
-                "details": f"Section '{section.get('role', 'unknown')}' is empty.",
+                "details": f"Section '{role}' is empty.",
+            })
+            continue
+
+        role = section.get("role", "other")
+        limit = limits.get(role)
+        if limit is None:
+            continue
+
+        pages = estimate_pages(content)
+        if pages > limit:
+            violations.append({
+                "section": role,
+                "rule": "page-limit",
+                "severity": "error",
+                "details": f"Section '{role}' estimated at {pages} pages, exceeds limit of {limit}.",
             })
 
     compliant = len(violations) == 0
@@ -118,17 +137,31 @@ def validate_compliance(request: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def read_json_input(raw: bytes) -> Any:
+    """Parse a JSON request read from stdin."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def write_json(result: dict[str, Any]) -> None:
+    """Write the JSON response to stdout."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result))
+    else:
+        sys.stdout.buffer.write(json.dumps(result).encode("utf-8"))
+    sys.stdout.buffer.flush()
+
+
 def main() -> None:
     """Main entry point."""
     try:
-        raw_input = sys.stdin.read()
+        raw_input = sys.stdin.buffer.read()
         if not raw_input.strip():
             result = {
                 "status": "error",
                 "error": {"code": "EMPTY_INPUT", "message": "No input provided"},
             }
         else:
-            request = json.loads(raw_input)
+            request = read_json_input(raw_input)
             result = validate_compliance(request)
     except json.JSONDecodeError as e:
         result = {
@@ -141,8 +174,7 @@ def main() -> None:
             "error": {"code": "UNEXPECTED_ERROR", "message": str(e)},
         }
 
-    json.dump(result, sys.stdout, indent=2)
-    sys.stdout.flush()
+    write_json(result)
 
 
 if __name__ == "__main__":
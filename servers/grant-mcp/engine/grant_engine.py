@@ -6,9 +6,13 @@ Handles grant proposal compilation via stdin/stdout JSON protocol.
 
 import json
 import sys
-import os
 from typing import Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def process_request(request: dict[str, Any]) -> dict[str, Any]:
     """Process a grant compilation request."""
@@ -57,8 +61,9 @@ def generate_docx(
         from docx import Document  # type: ignore[import-untyped]
         from docx.shared import Pt, Inches  # type: ignore[import-untyped]
         from docx.enum.text import WD_ALIGN_PARAGRAPH  # type: ignore[import-untyped]
+        from docx.oxml import OxmlElement  # type: ignore[import-untyped]
         import base64
-        import tempfile
+        import io
 
         doc = Document()
 
@@ -84,6 +89,13 @@ def generate_docx(
                 section.left_margin = Inches(1)
                 section.right_margin = Inches(1)
 
+        # Body paragraphs are built as bare <w:p> elements rather than through
+        # doc.add_paragraph, skipping the Paragraph/Run proxies and the
+        # per-call search for the insertion point. They must still precede
+        # the trailing <w:sectPr>, which holds the page setup.
+        body = doc.element.body
+        sect_pr = body.sectPr
+
         # Add sections
         for sec in sections:
             role = sec.get("role", "other")
@@ -94,15 +106,20 @@ def generate_docx(
             heading.alignment = WD_ALIGN_PARAGRAPH.LEFT
 
             for para_text in content.split("\n\n"):
-                if para_text.strip():
-                    doc.add_paragraph(para_text.strip())
-
-        # Save to temporary file and read as base64
-        with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as tmp:
-            doc.save(tmp.name)
-            with open(tmp.name, "rb") as f:
-                docx_base64 = base64.b64encode(f.read()).decode("utf-8")
-            os.unlink(tmp.name)
+                para_text = para_text.strip()
+                if not para_text:
+                    continue
+                p = OxmlElement("w:p")
+                p.add_r().text = para_text  # maps \t and \n like Run.text
+                if sect_pr is not None:
+                    sect_pr.addprevious(p)
+                else:
+                    body.append(p)
+
+        # Save in memory and encode the buffer without copying it
+        buf = io.BytesIO()
+        doc.save(buf)
+        docx_base64 = base64.b64encode(buf.getbuffer()).decode("ascii")
 
         return {
             "status": "success",
@@ -123,17 +140,31 @@ def generate_docx(
         }
 
 
+def read_json_input(raw: bytes) -> Any:
+    """Parse a JSON request read from stdin."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def write_json(result: dict[str, Any]) -> None:
+    """Write the JSON response to stdout."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result))
+    else:
+        sys.stdout.buffer.write(json.dumps(result).encode("utf-8"))
+    sys.stdout.buffer.flush()
+
+
 def main() -> None:
     """Main entry point: read JSON from stdin, write JSON to stdout."""
     try:
-        raw_input = sys.stdin.read()
+        raw_input = sys.stdin.buffer.read()
         if not raw_input.strip():
             result = {
                 "status": "error",
                 "error": {"code": "EMPTY_INPUT", "message": "No input provided"},
             }
         else:
-            request = json.loads(raw_input)
+            request = read_json_input(raw_input)
             result = process_request(request)
     except json.JSONDecodeError as e:
         result = {
@@ -146,8 +177,7 @@ def main() -> None:
             "error": {"code": "UNEXPECTED_ERROR", "message": str(e)},
         }
 
-    json.dump(result, sys.stdout, indent=2)
-    sys.stdout.flush()
+    write_json(result)
 
 
 if __name__ == "__main__":
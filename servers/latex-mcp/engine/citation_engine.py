@@ -7,56 +7,183 @@ Reads JSON from stdin:
 
 Writes JSON to stdout:
   { resolved: [{key, entry}], unresolved: [key] }
+
+Parsing prefers bibtexparser v2, then v1, then a minimal built-in
+parser that extracts entry keys and plain field values.
 """
 
 import json
+import re
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def main():
-    try:
-        data = json.loads(sys.stdin.read())
-    except json.JSONDecodeError as e:
-        json.dump({"error": f"Invalid JSON: {e}"}, sys.stdout)
-        sys.exit(1)
+try:
+    import bibtexparser
+except ImportError:
+    bibtexparser = None
+
+
+_ENTRY_START_RE = re.compile(r"@(\w+)\s*[{(]")
+_ENTRY_KEY_RE = re.compile(r"\s*([^,\s]+)\s*,")
+_FIELD_RE = re.compile(r"\s*([\w-]+)\s*=\s*")
+_BARE_VALUE_RE = re.compile(r"[^,})\s]+")
+_SKIPPED_ENTRY_TYPES = {"string", "preamble", "comment"}
+
+
+def _parse_bib(bibliography_content: str) -> dict[str, dict]:
+    """Parse a bibliography into an ID -> entry index."""
+    if bibtexparser is None:
+        return _parse_bib_minimal(bibliography_content)
+
+    if hasattr(bibtexparser, "parse_string"):
+        # bibtexparser v2: normalize to the v1 entry shape
+        library = bibtexparser.parse_string(bibliography_content)
+        entries_by_key = {}
+        for entry in library.entries:
+            record = {field.key.lower(): field.value for field in entry.fields}
+            record["ENTRYTYPE"] = entry.entry_type
+            record["ID"] = entry.key
+            entries_by_key[entry.key] = record
+        return entries_by_key
+
+    parser = bibtexparser.bparser.BibTexParser(common_strings=True)
+    bib_db = bibtexparser.loads(bibliography_content, parser=parser)
+    return {entry.get("ID", ""): entry for entry in bib_db.entries}
+
+
+def _parse_bib_minimal(content: str) -> dict[str, dict]:
+    """
+    Fallback parser for when bibtexparser is not installed.
+
+    Handles braced, quoted and bare field values; @string macros and
+    "#" concatenation are not expanded.
+    """
+    entries_by_key = {}
+    pos = 0
+    while (match := _ENTRY_START_RE.search(content, pos)) is not None:
+        entry_type = match.group(1).lower()
+        if entry_type in _SKIPPED_ENTRY_TYPES:
+            # Entries quoted inside a skipped block must not be parsed
+            pos = _skip_block(content, match.end() - 1)
+            continue
+
+        key = _ENTRY_KEY_RE.match(content, match.end())
+        if key is None:
+            pos = match.end()
+            continue
+
+        record = {"ENTRYTYPE": entry_type, "ID": key.group(1)}
+        pos = field_pos = key.end()
+        while (field := _FIELD_RE.match(content, field_pos)) is not None:
+            value, field_pos = _read_field_value(content, field.end())
+            record[field.group(1).lower()] = value
+            while field_pos < len(content) and content[field_pos].isspace():
+                field_pos += 1
+            if field_pos >= len(content) or content[field_pos] != ",":
+                break
+            field_pos += 1
+
+        entries_by_key[record["ID"]] = record
+    return entries_by_key
+
+
+def _skip_block(content: str, pos: int) -> int:
+    """Return the position just past the balanced block opened at pos."""
+    opener = content[pos]
+    closer = "}" if opener == "{" else ")"
+    depth = 0
+    for i in range(pos, len(content)):
+        if content[i] == opener:
+            depth += 1
+        elif content[i] == closer:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(content)
 
+
+def _read_field_value(content: str, pos: int) -> tuple[str, int]:
+    """Read one field value starting at pos; return it and the position after it."""
+    if pos >= len(content):
+        return "", pos
+
+    if content[pos] == "{":
+        depth = 0
+        for i in range(pos, len(content)):
+            if content[i] == "{":
+                depth += 1
+            elif content[i] == "}":
+                depth -= 1
+                if depth == 0:
+                    return content[pos + 1:i], i + 1
+        return content[pos + 1:], len(content)
+
+    if content[pos] == '"':
+        end = content.find('"', pos + 1)
+        if end < 0:
+            return content[pos + 1:], len(content)
+        return content[pos + 1:end], end + 1
+
+    bare = _BARE_VALUE_RE.match(content, pos)
+    if bare is None:
+        return "", pos
+    return bare.group(0), bare.end()
+
+
+def resolve_citations(data: dict) -> dict:
     bibliography_content = data.get("bibliography_content", "")
     citation_keys = data.get("citation_keys", [])
 
-    try:
-        import bibtexparser
+    entries_by_key = _parse_bib(bibliography_content)
 
-        parser = bibtexparser.bparser.BibTexParser(common_strings=True)
-        bib_db = bibtexparser.loads(bibliography_content, parser=parser)
+    resolved = []
+    unresolved = []
 
-        entries_by_key = {}
-        for entry in bib_db.entries:
-            entries_by_key[entry.get("ID", "")] = entry
-
-        resolved = []
-        unresolved = []
-
-        for key in citation_keys:
-            if key in entries_by_key:
-                resolved.append({
-                    "key": key,
-                    "entry": entries_by_key[key],
-                })
-            else:
-                unresolved.append(key)
-
-        json.dump({
-            "resolved": resolved,
-            "unresolved": unresolved,
-        }, sys.stdout)
-
-    except ImportError:
-        # bibtexparser not available — cannot resolve
-        json.dump({
-            "resolved": [],
-            "unresolved": citation_keys,
-            "warning": "bibtexparser not installed",
-        }, sys.stdout)
+    for key in citation_keys:
+        if key in entries_by_key:
+            resolved.append({
+                "key": key,
+                "entry": entries_by_key[key],
+            })
+        else:
+            unresolved.append(key)
+
+    output = {
+        "resolved": resolved,
+        "unresolved": unresolved,
+    }
+    if bibtexparser is None:
+        output["warning"] = "bibtexparser not installed; using minimal BibTeX parser"
+    return output
+
+
+def read_json_input():
+    """Parse the JSON request from stdin."""
+    raw = sys.stdin.buffer.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def write_json(result) -> None:
+    """Write the JSON response to stdout."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result))
+    else:
+        sys.stdout.buffer.write(json.dumps(result).encode("utf-8"))
+    sys.stdout.buffer.flush()
+
+
+def main():
+    try:
+        data = read_json_input()
+    except json.JSONDecodeError as e:
+        write_json({"error": f"Invalid JSON: {e}"})
+        sys.exit(1)
+
+    write_json(resolve_citations(data))
 
 
 if __name__ == "__main__":
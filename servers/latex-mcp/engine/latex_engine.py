@@ -4,6 +4,8 @@ latex_engine.py — Primary LaTeX conversion engine for zen-sci latex-mcp.
 
 Reads JSON from stdin:
   { request_id, source, frontmatter, bibliography, bibliography_style, latex_preamble, options }
+  options.emit_pdf (default true): set false to return latex_source only
+  and skip PDF compilation.
 
 Writes JSON to stdout:
   { pdf_base64, latex_source, page_count, warnings, citations }
@@ -14,16 +16,46 @@ Writes JSON to stdout:
 import json
 import sys
 import os
+import re
 import subprocess
 import tempfile
 import base64
+import hashlib
 import shutil
+import time
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "zen-sci"
+# Compiled PDFs keyed by a hash of the exact TeX source, so repeat
+# compiles of unchanged documents skip pdflatex entirely.
+PDF_CACHE_DIR = CACHE_DIR / "pdf"
+# Set ZEN_SCI_PDF_CACHE=0 to always compile and never touch the cache.
+PDF_CACHE_ENABLED = os.environ.get("ZEN_SCI_PDF_CACHE", "1") != "0"
+# Least recently used entries beyond this count are evicted after each store.
+PDF_CACHE_MAX_ENTRIES = 128
+# Persistent root for per-request working directories. It shares a
+# filesystem with PDF_CACHE_DIR so compiled PDFs move into the cache with
+# a single rename.
+SCRATCH_DIR = CACHE_DIR / "scratch"
+# Scratch entries older than this (seconds) belong to runs that were killed
+# before their finally block ran; compiles time out well within it.
+SCRATCH_MAX_AGE = 60 * 60
+UNSAFE_NAME_RE = re.compile(r"[^\w.-]")
+
 
 def main():
     try:
-        data = json.loads(sys.stdin.read())
+        data = read_json_input()
     except json.JSONDecodeError as e:
         write_error("json-parse-failed", f"Invalid JSON input: {e}")
         sys.exit(1)
@@ -35,11 +67,12 @@ def main():
     bib_style = data.get("bibliography_style", "apa")
     latex_preamble = data.get("latex_preamble")
     options = data.get("options", {})
+    emit_pdf = options.get("emit_pdf", True)
 
     warnings = []
 
-    # Create temp directory
-    tmpdir = tempfile.mkdtemp(prefix=f"zen-sci-latex-{request_id}-")
+    # Create working directory
+    tmpdir = create_workdir(request_id)
 
     try:
         md_path = os.path.join(tmpdir, "input.md")
@@ -84,75 +117,42 @@ def main():
         with open(tex_path, "r", encoding="utf-8") as f:
             latex_source = f.read()
 
-        # Inject custom preamble if provided
-        if latex_preamble:
-            idx = latex_source.find("\\begin{document}")
-            if idx >= 0:
-                latex_source = (
-                    latex_source[:idx] + latex_preamble + "\n" + latex_source[idx:]
-                )
-
-        # Inject frontmatter metadata
-        if frontmatter.get("title"):
-            if "\\title{" not in latex_source:
-                idx = latex_source.find("\\begin{document}")
-                if idx >= 0:
-                    latex_source = (
-                        latex_source[:idx]
-                        + f"\\title{{{frontmatter['title']}}}\n"
-                        + latex_source[idx:]
-                    )
-
-        # Ensure common packages
-        for pkg in ["microtype", "hyperref", "bookmark"]:
-            if f"\\usepackage{{{pkg}}}" not in latex_source:
-                idx = latex_source.find("\\begin{document}")
-                if idx >= 0:
-                    latex_source = (
-                        latex_source[:idx]
-                        + f"\\usepackage{{{pkg}}}\n"
-                        + latex_source[idx:]
-                    )
-
-        # Write post-processed TeX
-        with open(tex_path, "w", encoding="utf-8") as f:
-            f.write(latex_source)
-
-        # Compile with pdflatex (twice for cross-refs)
+        # Inject custom preamble, frontmatter title and common packages
+        latex_source = inject_preamble(latex_source, latex_preamble, frontmatter.get("title"))
+
         pdf_base64 = None
         page_count = None
 
-        try:
-            for _ in range(2):
-                proc = subprocess.run(
-                    ["pdflatex", "-interaction=nonstopmode", "-output-directory", tmpdir, tex_path],
-                    capture_output=True,
-                    text=True,
-                    timeout=60,
-                    cwd=tmpdir,
-                )
-                if proc.returncode != 0:
-                    warnings.append(f"pdflatex warning: {proc.stdout[-500:] if proc.stdout else 'no output'}")
-
-            if os.path.exists(pdf_path):
-                with open(pdf_path, "rb") as f:
-                    pdf_base64 = base64.b64encode(f.read()).decode("ascii")
-
-                # Count pages (rough estimate from PDF)
-                try:
-                    with open(pdf_path, "rb") as f:
-                        content = f.read()
-                        page_count = content.count(b"/Type /Page") - content.count(b"/Type /Pages")
-                        if page_count <= 0:
-                            page_count = 1
-                except Exception:
-                    page_count = None
-            else:
-                warnings.append("PDF file was not produced")
-        except FileNotFoundError:
-            warnings.append("pdflatex not found; returning LaTeX source only")
-        except subprocess.TimeoutExpired:
-            warnings.append("pdflatex compilation timed out (60s)")
+        # Compile with latexmk (pdflatex as many times as needed) unless the
+        # caller only asked for the TeX source
+        if emit_pdf:
+            # Write post-processed TeX
+            with open(tex_path, "w", encoding="utf-8") as f:
+                f.write(latex_source)
+
+            try:
+                cache_path = pdf_cache_path(latex_source)
+                if cache_path is not None and cache_path.is_file():
+                    touch_cached_pdf(cache_path)
+                    pdf_path = str(cache_path)
+                else:
+                    proc = compile_latex(tex_path, tmpdir)
+                    if proc.returncode != 0:
+                        log_tail = read_log_tail(tex_path, tmpdir)
+                        warnings.append(f"pdflatex warning: {log_tail or 'no output'}")
+                    elif cache_path is not None and os.path.exists(pdf_path):
+                        # Only clean compiles are cached, so hits never hide warnings
+                        pdf_path = store_cached_pdf(pdf_path, cache_path)
+
+                if os.path.exists(pdf_path):
+                    pdf_base64 = b64encode_file(pdf_path)
+                    page_count = count_pdf_pages(pdf_path)
+                else:
+                    warnings.append("PDF file was not produced")
+            except FileNotFoundError:
+                warnings.append("pdflatex not found; returning LaTeX source only")
+            except subprocess.TimeoutExpired:
+                warnings.append("pdflatex compilation timed out (60s)")
 
         # Build result
         result = {
@@ -169,12 +169,53 @@ def main():
         if page_count is not None:
             result["page_count"] = page_count
 
-        json.dump(result, sys.stdout)
+        write_json(result)
 
     finally:
         shutil.rmtree(tmpdir, ignore_errors=True)
 
 
+COMMON_PACKAGES = ("microtype", "hyperref", "bookmark")
+PREAMBLE_SCAN_RE = re.compile(r"\\title\{|\\usepackage\{(?:microtype|hyperref|bookmark)\}")
+
+
+def inject_preamble(latex_source: str, latex_preamble, title) -> str:
+    """
+    Insert the custom preamble, a \\title and any missing common packages
+    before \\begin{document} in a single splice.
+
+    Commands already present in the source or the custom preamble are not
+    repeated; the source is scanned once for all of them.
+    """
+    idx = latex_source.find("\\begin{document}")
+    if idx < 0:
+        return latex_source
+
+    found = {m.group(0) for m in PREAMBLE_SCAN_RE.finditer(latex_source)}
+    injected = []
+    if latex_preamble:
+        found.update(m.group(0) for m in PREAMBLE_SCAN_RE.finditer(latex_preamble))
+        injected.append(latex_preamble + "\n")
+    if title and "\\title{" not in found:
+        injected.append(f"\\title{{{title}}}\n")
+    for pkg in COMMON_PACKAGES:
+        if f"\\usepackage{{{pkg}}}" not in found:
+            injected.append(f"\\usepackage{{{pkg}}}\n")
+
+    if not injected:
+        return latex_source
+    return latex_source[:idx] + "".join(injected) + latex_source[idx:]
+
+
+# Line classifier for the fallback converter, tried in order on each
+# stripped line: "#"-"###" headings, "---" rules, then frontmatter-like
+# "key: value" lines (at most two words before the first colon). Each word
+# must end at whitespace or the colon, so a long word cannot be re-split
+# while backtracking.
+MD_LINE_RE = re.compile(r"(#{1,3}) (.*)|---|(?:[^:\s]+(?:\s+|(?=:))){0,2}:")
+HEADING_COMMANDS = {1: "section", 2: "subsection", 3: "subsubsection"}
+
+
 def basic_md_to_latex(source, frontmatter, preamble):
     """Fallback basic markdown to LaTeX converter."""
     lines = ["\\documentclass{article}"]
@@ -194,7 +235,8 @@ def basic_md_to_latex(source, frontmatter, preamble):
         lines.append(f"\\title{{{title}}}")
     if author:
         if isinstance(author, list):
-            lines.append(f"\\author{{{' \\\\and '.join(author)}}}")
+            separator = " \\and "
+            lines.append(f"\\author{{{separator.join(author)}}}")
         else:
             lines.append(f"\\author{{{author}}}")
     if title:
@@ -202,28 +244,220 @@ def basic_md_to_latex(source, frontmatter, preamble):
 
     for line in source.split("\n"):
         stripped = line.strip()
-        if stripped.startswith("# "):
-            lines.append(f"\\section{{{stripped[2:]}}}")
-        elif stripped.startswith("## "):
-            lines.append(f"\\subsection{{{stripped[3:]}}}")
-        elif stripped.startswith("### "):
-            lines.append(f"\\subsubsection{{{stripped[4:]}}}")
-        elif stripped.startswith("---"):
-            pass
-        elif ":" in stripped and len(stripped.split(":")[0].split()) <= 2:
-            pass  # Skip frontmatter lines
-        elif stripped:
-            lines.append(stripped)
+        # Only headings, rules and lines with a colon can match; plain text
+        # skips the regex entirely.
+        if ":" in stripped or stripped.startswith(("#", "-")):
+            match = MD_LINE_RE.match(stripped)
+        else:
+            match = None
+        if match is None:
+            if stripped:
+                lines.append(stripped)
+        elif match.group(1):
+            command = HEADING_COMMANDS[len(match.group(1))]
+            lines.append(f"\\{command}{{{match.group(2)}}}")
+        # Otherwise a "---" rule or frontmatter line: skip
 
     lines.append("\\end{document}")
     return "\n".join(lines)
 
 
+# Read size for streaming base64: a multiple of 3 so each chunk encodes
+# without padding and the pieces concatenate into one valid encoding.
+B64_CHUNK_SIZE = 57 * 1024
+
+
+def b64encode_file(path) -> str:
+    """Base64-encode a file chunk by chunk instead of reading it whole."""
+    encoded = bytearray()
+    with open(path, "rb") as f:
+        while chunk := f.read(B64_CHUNK_SIZE):
+            encoded += base64.b64encode(chunk)
+    return encoded.decode("ascii")
+
+
+def pdf_cache_path(latex_source: str) -> Path | None:
+    """Return the cache location for the PDF compiled from latex_source, or None if disabled."""
+    if not PDF_CACHE_ENABLED:
+        return None
+    key = hashlib.blake2b(latex_source.encode("utf-8"), digest_size=16).hexdigest()
+    return PDF_CACHE_DIR / f"{key}.pdf"
+
+
+def store_cached_pdf(pdf_path, cache_path: Path) -> str:
+    """
+    Move a compiled PDF into the cache and return where it now lives.
+
+    From the scratch directory this is one atomic rename; across
+    filesystems (the mkdtemp fallback) the PDF is copied and renamed into
+    place instead.
+    """
+    try:
+        # Private: cached PDFs are the user's compiled documents
+        cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        try:
+            os.replace(pdf_path, cache_path)
+            pdf_path = cache_path
+        except OSError:
+            partial = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            shutil.copyfile(pdf_path, partial)
+            os.replace(partial, cache_path)
+    except OSError:
+        return str(pdf_path)  # Caching is best-effort; the compiled PDF is still returned
+    prune_pdf_cache()
+    return str(pdf_path)
+
+
+def touch_cached_pdf(cache_path: Path) -> None:
+    """Refresh a hit's mtime so prune_pdf_cache() evicts least recently used PDFs first."""
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass  # Evicted concurrently; the caller notices when it reads the file
+
+
+def prune_pdf_cache(max_entries: int = PDF_CACHE_MAX_ENTRIES) -> None:
+    """Delete the least recently used cached PDFs until at most max_entries remain."""
+    entries = []
+    try:
+        with os.scandir(PDF_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".pdf"):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        pass  # Removed concurrently
+    except OSError:
+        return
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def create_workdir(request_id: str) -> str:
+    """
+    Create the working directory for one request under SCRATCH_DIR.
+
+    Both directories are private (0700), like mkdtemp's, since they hold the
+    user's source and bibliography. Falls back to a fresh system temp
+    directory if the scratch root cannot be used. The caller removes the
+    directory when the request finishes.
+    """
+    workdir = SCRATCH_DIR / f"{UNSAFE_NAME_RE.sub('_', request_id)}-{os.getpid()}"
+    try:
+        SCRATCH_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        prune_scratch()
+        workdir.mkdir(mode=0o700)
+        return str(workdir)
+    except OSError:
+        return tempfile.mkdtemp(prefix=f"zen-sci-latex-{request_id}-")
+
+
+def prune_scratch(max_age: float = SCRATCH_MAX_AGE) -> None:
+    """Remove scratch entries left behind by runs killed mid-request (e.g. on timeout)."""
+    cutoff = time.time() - max_age
+    stale = []
+    try:
+        with os.scandir(SCRATCH_DIR) as it:
+            for entry in it:
+                try:
+                    if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                        stale.append(entry.path)
+                except OSError:
+                    pass  # Removed concurrently
+    except OSError:
+        return
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def compile_latex(tex_path, output_dir) -> subprocess.CompletedProcess:
+    """
+    Compile a TeX file to PDF and return the final compiler run.
+
+    latexmk reruns pdflatex only until the .aux file is stable (and runs
+    bibtex/biber when needed), so simple documents take a single pass.
+    Falls back to two fixed pdflatex passes when latexmk is not installed;
+    raises FileNotFoundError if pdflatex is missing too. Compiler output is
+    discarded; use read_log_tail() for diagnostics on failure.
+    """
+    try:
+        return subprocess.run(
+            ["latexmk", "-pdf", "-interaction=nonstopmode", f"-outdir={output_dir}", str(tex_path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=60,
+            cwd=output_dir,
+        )
+    except FileNotFoundError:
+        pass
+
+    # Fallback: pdflatex twice for cross-refs
+    for _ in range(2):
+        proc = subprocess.run(
+            ["pdflatex", "-interaction=nonstopmode", "-output-directory", output_dir, str(tex_path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=60,
+            cwd=output_dir,
+        )
+    return proc
+
+
+def read_log_tail(tex_path, output_dir, size: int = 500) -> str:
+    """Return the last `size` bytes of the TeX log written next to the PDF."""
+    log_path = Path(output_dir) / f"{Path(tex_path).stem}.log"
+    try:
+        with open(log_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - size, 0))
+            return f.read().decode("utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+# Page objects for the byte-scan fallback: "/Type /Page" or "/Type/Page",
+# but not "/Pages" or other names that merely start with "Page".
+PAGE_OBJECT_RE = re.compile(rb"/Type\s*/Page(?![\w#])")
+
+
+def count_pdf_pages(pdf_path) -> int | None:
+    """Count PDF pages from the xref via pypdf, falling back to a byte scan."""
+    try:
+        if PdfReader is not None:
+            return len(PdfReader(pdf_path).pages)
+        # Rough estimate in one pass: misses pages in compressed object streams
+        with open(pdf_path, "rb") as f:
+            content = f.read()
+        page_count = len(PAGE_OBJECT_RE.findall(content))
+        return page_count if page_count > 0 else 1
+    except Exception:
+        return None
+
+
+def read_json_input():
+    """Parse the JSON request from stdin."""
+    raw = sys.stdin.buffer.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def write_json(result) -> None:
+    """Write the JSON response to stdout."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result))
+    else:
+        sys.stdout.buffer.write(json.dumps(result).encode("utf-8"))
+    sys.stdout.buffer.flush()
+
+
 def write_error(code, message, details=None):
     error = {"error": {"code": code, "message": message}}
     if details:
         error["error"]["details"] = details
-    json.dump(error, sys.stdout)
+    write_json(error)
 
 
 if __name__ == "__main__":
@@ -2,30 +2,88 @@
 """
 math_validator.py — Batch math expression validation using SymPy.
 
-Reads JSON from stdin:
+Runs as a persistent worker: reads newline-delimited JSON from stdin,
+one batch per line:
   { expressions: [{ id, expression, context }] }
 
-Writes JSON to stdout:
+Writes one JSON line to stdout per batch:
   { results: [{ id, valid, error? }] }
+
+The worker exits when stdin is closed, so the SymPy import and LaTeX
+parser initialization are paid once rather than per batch. Large batches
+are fanned out over a process pool, since parse_latex is CPU-bound and
+holds the GIL.
 """
 
 import json
+import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def main():
+try:
+    from sympy.parsing.latex import parse_latex
+    SYMPY_AVAILABLE = True
+except ImportError:
+    SYMPY_AVAILABLE = False
+
+
+@lru_cache(maxsize=4096)
+def _cached_parse_latex(expr: str):
+    return parse_latex(expr)
+
+
+# Below this many distinct expressions, pickling round-trips to the pool
+# cost more than parsing in-process.
+PARALLEL_THRESHOLD = 64
+CHUNKSIZE = 32
+
+# "$$" precedes "$" so the longer delimiter wins in a single pass.
+_DELIMITERS = re.compile(r"\$\$|\$|\\\[|\\\]|\\\(|\\\)")
+
+
+def _strip_delimiters(expression: str) -> str:
+    """Strip display/inline math delimiters from an expression."""
+    return _DELIMITERS.sub("", expression.strip()).strip()
+
+
+def _parse_error(cleaned: str) -> str | None:
+    """Return the parse error for a delimiter-stripped expression, or None if valid."""
+    if not cleaned:
+        return None
     try:
-        data = json.loads(sys.stdin.read())
-    except json.JSONDecodeError as e:
-        json.dump({"error": f"Invalid JSON: {e}"}, sys.stdout)
-        sys.exit(1)
+        _cached_parse_latex(cleaned)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def _loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 
-    expressions = data.get("expressions", [])
+def _write_line(output: dict) -> None:
+    """Write one newline-terminated JSON response and flush it to the caller."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(output, option=orjson.OPT_APPEND_NEWLINE))
+    else:
+        sys.stdout.buffer.write((json.dumps(output) + "\n").encode("utf-8"))
+    sys.stdout.buffer.flush()
+
+
+def validate_batch(
+    expressions: list, executor: ProcessPoolExecutor | None = None
+) -> list:
     results = []
 
-    try:
-        from sympy.parsing.latex import parse_latex
-    except ImportError:
+    if not SYMPY_AVAILABLE:
         # If sympy not available, mark all as valid with warning
         for expr in expressions:
             results.append({
@@ -33,31 +91,93 @@ def main():
                 "valid": True,
                 "warning": "sympy not available; skipping validation",
             })
-        json.dump({"results": results}, sys.stdout)
-        return
+        return results
 
-    for expr in expressions:
+    # Strip delimiters up front so identical equations are parsed once per
+    # batch; None marks an expression that could not be cleaned.
+    cleaned_exprs: list[str | None] = []
+    clean_errors: dict[int, str] = {}
+    for i, expr in enumerate(expressions):
+        try:
+            cleaned_exprs.append(_strip_delimiters(expr.get("expression", "")))
+        except Exception as e:
+            cleaned_exprs.append(None)
+            clean_errors[i] = str(e)
+
+    unique = list(dict.fromkeys(c for c in cleaned_exprs if c is not None))
+    if executor is not None and len(unique) >= PARALLEL_THRESHOLD:
+        # BrokenProcessPool propagates so serve() can replace the pool.
+        outcomes = list(executor.map(_parse_error, unique, chunksize=CHUNKSIZE))
+    else:
+        outcomes = [_parse_error(c) for c in unique]
+    # None = valid, else the error message
+    errors_by_expr = dict(zip(unique, outcomes))
+
+    for i, (expr, cleaned) in enumerate(zip(expressions, cleaned_exprs)):
         expr_id = expr.get("id", "")
-        expression = expr.get("expression", "")
+        error = clean_errors[i] if cleaned is None else errors_by_expr[cleaned]
 
-        try:
-            # Strip display math delimiters
-            cleaned = expression.strip()
-            for delim in ["$$", "$", "\\[", "\\]", "\\(", "\\)"]:
-                cleaned = cleaned.replace(delim, "")
-            cleaned = cleaned.strip()
-
-            if cleaned:
-                parse_latex(cleaned)
+        if error is None:
             results.append({"id": expr_id, "valid": True})
-        except Exception as e:
+        else:
             results.append({
                 "id": expr_id,
                 "valid": False,
-                "error": str(e),
+                "error": error,
             })
 
-    json.dump({"results": results}, sys.stdout)
+    return results
+
+
+def _create_executor() -> ProcessPoolExecutor | None:
+    """Create the batch process pool, or None where multiprocessing is unavailable."""
+    cpu_count = os.cpu_count() or 1
+    if not SYMPY_AVAILABLE or cpu_count < 2:
+        return None
+    try:
+        return ProcessPoolExecutor(max_workers=cpu_count)
+    except (OSError, NotImplementedError):
+        return None
+
+
+def main():
+    serve()
+
+
+def serve() -> None:
+    executor = _create_executor()
+    try:
+        while True:
+            line = sys.stdin.buffer.readline()
+            if not line:
+                break  # stdin closed — caller is done with this worker
+            if not line.strip():
+                continue
+
+            try:
+                data = _loads(line)
+            except json.JSONDecodeError as e:
+                _write_line({"error": f"Invalid JSON: {e}"})
+                continue
+
+            expressions = data.get("expressions", []) if isinstance(data, dict) else None
+            if not isinstance(expressions, list) or not all(isinstance(e, dict) for e in expressions):
+                # Answer instead of raising so the worker stays up
+                _write_line({"error": "Invalid request: expected {expressions: [{id, expression}]}"})
+                continue
+            try:
+                results = validate_batch(expressions, executor)
+            except BrokenProcessPool:
+                # A pool worker died (e.g. OOM-killed). Answer this batch
+                # in-process and start a fresh pool for the next one.
+                executor.shutdown(cancel_futures=True)
+                executor = _create_executor()
+                results = validate_batch(expressions)
+
+            _write_line({"results": results})
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
 
 if __name__ == "__main__":
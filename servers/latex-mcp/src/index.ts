@@ -55,6 +55,7 @@ registerAppTool(
         geometry: z.string().optional().describe('Page geometry string'),
         font: z.string().optional().describe('Font family'),
         draft_mode: z.boolean().optional().describe('Enable draft mode'),
+        emit_pdf: z.boolean().optional().describe('Compile a PDF (default true); false returns LaTeX source only'),
       }).optional().describe('Conversion options'),
     },
     _meta: {
@@ -79,6 +80,7 @@ registerAppTool(
       if (rawArgs.options.geometry !== undefined) opts.geometry = rawArgs.options.geometry;
       if (rawArgs.options.font !== undefined) opts.font = rawArgs.options.font;
       if (rawArgs.options.draft_mode !== undefined) opts.draft_mode = rawArgs.options.draft_mode;
+      if (rawArgs.options.emit_pdf !== undefined) opts.emit_pdf = rawArgs.options.emit_pdf;
       args.options = opts;
     }
 
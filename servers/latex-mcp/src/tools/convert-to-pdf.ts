@@ -34,6 +34,8 @@ export interface ConvertToPdfArgs {
     geometry?: string;
     font?: string;
     draft_mode?: boolean;
+    /** Compile a PDF (default true); false returns the LaTeX source only. */
+    emit_pdf?: boolean;
   };
 }
 
@@ -83,6 +85,7 @@ export async function convertToPdf(
     if (args.options.geometry !== undefined) requestOptions['geometry'] = args.options.geometry;
     if (args.options.font !== undefined) requestOptions['font'] = args.options.font;
     if (args.options.draft_mode !== undefined) requestOptions['draft_mode'] = args.options.draft_mode;
+    if (args.options.emit_pdf !== undefined) requestOptions['emit_pdf'] = args.options.emit_pdf;
   }
 
   // Resolve citations
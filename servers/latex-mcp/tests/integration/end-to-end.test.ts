@@ -13,9 +13,12 @@ import { spawn } from 'node:child_process';
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 const FIXTURES_DIR = join(__dirname, '../../fixtures');
+const CITATION_ENGINE_PATH = join(__dirname, '../../engine/citation_engine.py');
+const LATEX_ENGINE_PATH = join(__dirname, '../../engine/latex_engine.py');
 
 let pandocAvailable = false;
 let pdflatexAvailable = false;
+let pythonAvailable = false;
 
 async function checkCommand(cmd: string): Promise<boolean> {
   return new Promise((resolve) => {
@@ -36,6 +39,7 @@ function makeCtx(): ZenSciContext {
 beforeAll(async () => {
   pandocAvailable = await checkCommand('pandoc');
   pdflatexAvailable = await checkCommand('pdflatex');
+  pythonAvailable = await makeCtx().pythonEngine.checkAvailable();
 });
 
 describe('End-to-end (requires pandoc + TeX)', () => {
@@ -139,3 +143,46 @@ describe('End-to-end (no system deps needed)', () => {
     expect(result.bibliography_entries).toBe(2);
   });
 });
+
+describe('citation_engine.py (requires Python)', () => {
+  it('does not resolve entries quoted inside @comment blocks', async () => {
+    if (!pythonAvailable) return;
+
+    const ctx = makeCtx();
+    const bib = readFileSync(join(FIXTURES_DIR, 'skipped-blocks.bib'), 'utf-8');
+    const result = await ctx.pythonEngine.runJSON<{
+      resolved: { key: string; entry: Record<string, string> }[];
+      unresolved: string[];
+    }>(CITATION_ENGINE_PATH, {
+      bibliography_content: bib,
+      citation_keys: ['smith2020', 'knuth1997', 'fake2019'],
+    });
+
+    expect(result.resolved.map((r) => r.key)).toEqual(['smith2020', 'knuth1997']);
+    expect(result.resolved[0]?.entry['title']).toBe('Quantum Computing in the Wild');
+    expect(result.unresolved).toEqual(['fake2019']);
+  });
+});
+
+describe('latex_engine.py (requires Python)', () => {
+  it('converts a long colon-free line in linear time', async () => {
+    if (!pythonAvailable) return;
+
+    // Exercises the fallback Markdown converter when pypandoc is absent; a
+    // backtracking line classifier took tens of seconds on this input.
+    const longLine = '漢'.repeat(32_000);
+    const ctx = makeCtx();
+    const result = await ctx.pythonEngine.runJSON<{ latex_source: string }>(
+      LATEX_ENGINE_PATH,
+      {
+        request_id: 'long-line',
+        source: `# Title\n\n${longLine}\n\nkey: value`,
+        frontmatter: {},
+        options: { emit_pdf: false },
+      },
+      5_000,
+    );
+
+    expect(result.latex_source).toContain(longLine);
+  });
+});
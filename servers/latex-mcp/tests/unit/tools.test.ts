@@ -1,4 +1,4 @@
-import { describe, it, expect } from 'vitest';
+import { describe, it, expect, vi } from 'vitest';
 import { createZenSciServer } from '@zen-sci/sdk';
 import type { ZenSciContext } from '@zen-sci/sdk';
 import { latexManifest } from '../../src/manifest.js';
@@ -140,6 +140,30 @@ describe('convertToPdf', () => {
     expect(Array.isArray(result.warnings)).toBe(true);
   });
 
+  it('forwards emit_pdf: false to the engine and returns its LaTeX source', async () => {
+    const ctx = makeCtx();
+    vi.spyOn(ctx.pythonEngine, 'checkAvailable').mockResolvedValue(true);
+    const runJSON = vi
+      .spyOn(ctx.pythonEngine, 'runJSON')
+      .mockResolvedValue({ latex_source: '\\section{Hello}', warnings: [] });
+
+    const result = await convertToPdf(
+      {
+        source: '# Hello\n\nWorld',
+        title: 'Source Only',
+        options: { emit_pdf: false },
+      },
+      ctx,
+    );
+
+    expect(runJSON).toHaveBeenCalledTimes(1);
+    const engineInput = runJSON.mock.calls[0]?.[1] as { options: Record<string, unknown> };
+    expect(engineInput.options['emit_pdf']).toBe(false);
+    expect(result.latex_source).toBe('\\section{Hello}');
+    expect(result.pdf_base64).toBeUndefined();
+    expect(result.page_count).toBeUndefined();
+  });
+
   it('includes citation stats in result', async () => {
     const ctx = makeCtx();
     const result = await convertToPdf(
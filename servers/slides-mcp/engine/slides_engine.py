@@ -10,13 +10,163 @@ This is a stub implementation. Full compilation requires:
   - pdflatex (TeX Live or MiKTeX)
 """
 
+import base64
+import hashlib
 import json
 import sys
 import os
+import re
+import shutil
 import tempfile
 import subprocess
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+# Compiled PDFs keyed by a hash of the exact TeX source, so repeat
+# compiles of unchanged documents skip pdflatex entirely.
+PDF_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "zen-sci" / "pdf"
+# Set ZEN_SCI_PDF_CACHE=0 to always compile and never touch the cache.
+PDF_CACHE_ENABLED = os.environ.get("ZEN_SCI_PDF_CACHE", "1") != "0"
+# Least recently used entries beyond this count are evicted after each store.
+PDF_CACHE_MAX_ENTRIES = 128
+
+
+# Read size for streaming base64: a multiple of 3 so each chunk encodes
+# without padding and the pieces concatenate into one valid encoding.
+B64_CHUNK_SIZE = 57 * 1024
+
+
+def b64encode_file(path) -> str:
+    """Base64-encode a file chunk by chunk instead of reading it whole."""
+    encoded = bytearray()
+    with open(path, "rb") as f:
+        while chunk := f.read(B64_CHUNK_SIZE):
+            encoded += base64.b64encode(chunk)
+    return encoded.decode("ascii")
+
+
+def pdf_cache_path(latex_source: str) -> Path | None:
+    """Return the cache location for the PDF compiled from latex_source, or None if disabled."""
+    if not PDF_CACHE_ENABLED:
+        return None
+    key = hashlib.blake2b(latex_source.encode("utf-8"), digest_size=16).hexdigest()
+    return PDF_CACHE_DIR / f"{key}.pdf"
+
+
+def store_cached_pdf(pdf_path, cache_path: Path) -> None:
+    """Copy a compiled PDF into the cache; the final rename is atomic."""
+    try:
+        # Private: cached PDFs are the user's compiled documents
+        cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        partial = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        shutil.copyfile(pdf_path, partial)
+        os.replace(partial, cache_path)
+    except OSError:
+        return  # Caching is best-effort; the compiled PDF is still returned
+    prune_pdf_cache()
+
+
+def touch_cached_pdf(cache_path: Path) -> None:
+    """Refresh a hit's mtime so prune_pdf_cache() evicts least recently used PDFs first."""
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass  # Evicted concurrently; the caller notices when it reads the file
+
+
+def prune_pdf_cache(max_entries: int = PDF_CACHE_MAX_ENTRIES) -> None:
+    """Delete the least recently used cached PDFs until at most max_entries remain."""
+    entries = []
+    try:
+        with os.scandir(PDF_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".pdf"):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        pass  # Removed concurrently
+    except OSError:
+        return
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def compile_latex(tex_path, output_dir) -> subprocess.CompletedProcess:
+    """
+    Compile a TeX file to PDF and return the final compiler run.
+
+    latexmk reruns pdflatex only until the .aux file is stable (and runs
+    bibtex/biber when needed), so simple documents take a single pass.
+    Falls back to two fixed pdflatex passes when latexmk is not installed;
+    raises FileNotFoundError if pdflatex is missing too. Compiler output is
+    discarded; use read_log_tail() for diagnostics on failure.
+    """
+    try:
+        return subprocess.run(
+            ["latexmk", "-pdf", "-interaction=nonstopmode", f"-outdir={output_dir}", str(tex_path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=60,
+            cwd=output_dir,
+        )
+    except FileNotFoundError:
+        pass
+
+    # Fallback: pdflatex twice for cross-refs
+    for _ in range(2):
+        proc = subprocess.run(
+            ["pdflatex", "-interaction=nonstopmode", "-output-directory", output_dir, str(tex_path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=60,
+            cwd=output_dir,
+        )
+    return proc
+
+
+def read_log_tail(tex_path, output_dir, size: int = 500) -> str:
+    """Return the last `size` bytes of the TeX log written next to the PDF."""
+    log_path = Path(output_dir) / f"{Path(tex_path).stem}.log"
+    try:
+        with open(log_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - size, 0))
+            return f.read().decode("utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+# Page objects for the byte-scan fallback: "/Type /Page" or "/Type/Page",
+# but not "/Pages" or other names that merely start with "Page".
+PAGE_OBJECT_RE = re.compile(rb"/Type\s*/Page(?![\w#])")
+
+
+def count_pdf_pages(pdf_path) -> int | None:
+    """Count PDF pages from the xref via pypdf, falling back to a byte scan."""
+    try:
+        if PdfReader is not None:
+            return len(PdfReader(pdf_path).pages)
+        # Rough estimate in one pass: misses pages in compressed object streams
+        with open(pdf_path, "rb") as f:
+            content = f.read()
+        page_count = len(PAGE_OBJECT_RE.findall(content))
+        return page_count if page_count > 0 else 1
+    except Exception:
+        return None
+
 
 def compile_beamer_to_pdf(latex_source: str, output_dir: str | None = None) -> dict:
     """
@@ -36,36 +186,36 @@ def compile_beamer_to_pdf(latex_source: str, output_dir: str | None = None) -> d
         tex_path = Path(tmpdir) / "slides.tex"
         tex_path.write_text(latex_source, encoding="utf-8")
 
+        pdf_path = Path(tmpdir) / "slides.pdf"
+        cache_path = pdf_cache_path(latex_source)
+
         try:
-            # Try pdflatex compilation (two passes for references)
-            for pass_num in range(2):
-                result = subprocess.run(
-                    ["pdflatex", "-interaction=nonstopmode", "-output-directory", tmpdir, str(tex_path)],
-                    capture_output=True,
-                    text=True,
-                    timeout=60,
-                )
-                if result.returncode != 0 and pass_num == 1:
-                    warnings.append(f"pdflatex warnings: {result.stdout[-500:]}")
-
-            pdf_path = Path(tmpdir) / "slides.pdf"
+            if cache_path is not None and cache_path.is_file():
+                touch_cached_pdf(cache_path)
+                pdf_path = cache_path
+            else:
+                # Compile via latexmk (falls back to two pdflatex passes)
+                result = compile_latex(tex_path, tmpdir)
+                if result.returncode != 0:
+                    warnings.append(f"pdflatex warnings: {read_log_tail(tex_path, tmpdir)}")
+                elif cache_path is not None and pdf_path.exists():
+                    # Only clean compiles are cached, so hits never hide warnings
+                    store_cached_pdf(pdf_path, cache_path)
+
             if pdf_path.exists():
-                import base64
-                pdf_bytes = pdf_path.read_bytes()
-                pdf_base64 = base64.b64encode(pdf_bytes).decode("ascii")
+                pdf_base64 = b64encode_file(pdf_path)
 
                 # Copy to output dir if specified
                 final_path = None
                 if output_dir:
                     os.makedirs(output_dir, exist_ok=True)
                     final_path = str(Path(output_dir) / "slides.pdf")
-                    with open(final_path, "wb") as f:
-                        f.write(pdf_bytes)
+                    shutil.copyfile(pdf_path, final_path)
 
                 return {
                     "pdf_path": final_path,
                     "pdf_base64": pdf_base64,
-                    "page_count": None,  # Would need PDF parsing
+                    "page_count": count_pdf_pages(pdf_path),
                     "warnings": warnings,
                 }
             else:
@@ -95,29 +245,38 @@ def compile_beamer_to_pdf(latex_source: str, output_dir: str | None = None) -> d
             }
 
 
+def read_json_input() -> dict:
+    """Parse the JSON request from stdin."""
+    raw = sys.stdin.buffer.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def write_json(result: dict) -> None:
+    """Write the JSON response to stdout."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result))
+    else:
+        sys.stdout.buffer.write(json.dumps(result).encode("utf-8"))
+    sys.stdout.buffer.flush()
+
+
 def main():
     """Main entry point: read JSON from stdin, process, write JSON to stdout."""
     try:
-        request = json.loads(sys.stdin.read())
+        request = read_json_input()
     except json.JSONDecodeError as e:
-        json.dump({"error": {"code": "INVALID_JSON", "message": str(e)}}, sys.stdout)
-        sys.stdout.flush()
+        write_json({"error": {"code": "INVALID_JSON", "message": str(e)}})
         return
 
     latex_source = request.get("latex_source", "")
     output_dir = request.get("output_dir")
 
     if not latex_source:
-        json.dump(
-            {"error": {"code": "MISSING_SOURCE", "message": "No latex_source provided"}},
-            sys.stdout,
-        )
-        sys.stdout.flush()
+        write_json({"error": {"code": "MISSING_SOURCE", "message": "No latex_source provided"}})
         return
 
     result = compile_beamer_to_pdf(latex_source, output_dir)
-    json.dump(result, sys.stdout)
-    sys.stdout.flush()
+    write_json(result)
 
 
 if __name__ == "__main__":